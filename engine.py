@@ -12,8 +12,43 @@ from __future__ import print_function
 import sgtk
 import nuke
 import os
-import nukescripts
 import logging
+import collections
+
+# Location of the engine's files on disk, resolved once at import time.
+_ENGINE_DIR = os.path.dirname(os.path.abspath(__file__))
+_RESOURCES_DIR = os.path.join(_ENGINE_DIR, "resources")
+_SG_LOGO_PATH = os.path.join(_RESOURCES_DIR, "sg_logo_80px.png")
+
+# Nuke wants forward slashes in the paths it is given, which only requires
+# translating paths on Windows.
+_NEEDS_SLASH_FIX = os.path.sep != "/"
+
+# Built-in Nuke tabs that a panel can be parented next to when it is shown
+# from a non-pane menu, in order of preference.
+#
+# Note: on Nuke versions prior to 9, a pane is required for the UI to appear.
+_BUILT_IN_TABS = (
+    "Properties.1",  # properties dialog - best choice to parent next to
+    "DAG.1",  # node graph, so usually wide not tall
+    "DopeSheet.1",  # dope sheet, usually wide, not tall
+    "Viewer.1",  # viewer
+    "Toolbar.1",  # nodes toolbar
+)
+
+# File types the favorite directories are shown for in Nuke's file dialogs.
+_FAVORITE_DIR_TYPES = nuke.IMAGE | nuke.SCRIPT | nuke.GEO
+
+# Favorite directories added by older versions of the engine, which are
+# removed when setting up the current ones.
+_LEGACY_FAVORITE_NAMES = tuple(
+    "Tank Current %s" % entity_type
+    for entity_type in ("Shot", "Sequence", "Scene", "Asset", "Project")
+) + (
+    "Tank Current Work",
+    "PTR Current Project",
+    "PTR Current Work",
+)
 
 
 class NukeEngine(sgtk.platform.Engine):
@@ -87,15 +122,31 @@ class NukeEngine(sgtk.platform.Engine):
         # For the short term, we will treat Nuke Studio as if it
         # is Hiero. This logic will change once we have true Nuke
         # Studio support for this engine.
-        self._hiero_enabled = nuke.env.get("hiero")
-        self._studio_enabled = nuke.env.get("studio")
-        self._ui_enabled = nuke.env.get("gui")
+        nuke_env = nuke.env
+        self._hiero_enabled = nuke_env.get("hiero")
+        self._studio_enabled = nuke_env.get("studio")
+        self._ui_enabled = nuke_env.get("gui")
+        self._nuke_version = (
+            nuke_env.get("NukeVersionMajor"),
+            nuke_env.get("NukeVersionMinor"),
+            nuke_env.get("NukeVersionRelease"),
+        )
         self._context_switcher = None
         self._menu_generator = None
+        self._menu_built = True
         self._context_change_menu_rebuild = True
-        self._processed_paths = []
-        self._processed_environments = []
+        self._processed_paths = set()
+        self._processed_environments = set()
         self._previous_generators = []
+        self._serialized_context = (None, None)
+        self._hiero_log = None
+        self._host_info = None
+        self._setting_cache = {}
+        self._gizmo_folders = set()
+        self._favorite_dirs = {}
+        # Hiero menu event state, updated by the menu generator.
+        self._last_clicked_selection = []
+        self._last_clicked_area = None
 
         super(NukeEngine, self).__init__(*args, **kwargs)
 
@@ -139,7 +190,22 @@ class NukeEngine(sgtk.platform.Engine):
         """
         Indicates if we are running one of the builtin plugins.
         """
-        return True if self.get_setting("launch_builtin_plugins") else False
+        return True if self._get_cached_setting("launch_builtin_plugins") else False
+
+    def _get_cached_setting(self, name, default=None):
+        """
+        Returns the value of an engine setting, only resolving it the first
+        time it is requested. The cache is cleared when the context changes.
+
+        :param str name: Name of the setting.
+        :param default: Value to return if the setting isn't defined.
+        :returns: The value of the setting.
+        """
+        try:
+            return self._setting_cache[name]
+        except KeyError:
+            value = self._setting_cache[name] = self.get_setting(name, default)
+            return value
 
     #####################################################################################
     # Engine Initialization and Destruction
@@ -152,6 +218,7 @@ class NukeEngine(sgtk.platform.Engine):
 
         self.logger.debug("%s: Initializing...", self)
 
+        MIN_VERSION = (7, 0, 10)  # older versions are not supported
         MAX_VERSION = (15, 1)  # untested above this so display a warning
 
         import tk_nuke
@@ -163,24 +230,15 @@ class NukeEngine(sgtk.platform.Engine):
         # 6.3v5 and 9.0v*. For versions higher than what we know we
         # support we'll simply warn and continue. For older versions
         # we will have to bail out, as we know they won't work properly.
-        nuke_version = (
-            nuke.env.get("NukeVersionMajor"),
-            nuke.env.get("NukeVersionMinor"),
-            nuke.env.get("NukeVersionRelease"),
-        )
+        nuke_version = self._nuke_version
 
-        msg = "Nuke 7.0v10 is the minimum version supported!"
-        if nuke_version[0] < 7:
-            self.logger.error(msg)
-            return
-        elif nuke_version[0] == 7 and nuke_version[1] == 0 and nuke_version[2] < 10:
-            self.logger.error(msg)
+        if nuke_version < MIN_VERSION:
+            self.logger.error("Nuke 7.0v10 is the minimum version supported!")
             return
 
-        # Versions > 14.0 have not yet been tested so show a message to that effect.
-        if nuke_version[0] > MAX_VERSION[0] or (
-            nuke_version[0] == MAX_VERSION[0] and nuke_version[1] > MAX_VERSION[1]
-        ):
+        # Versions above MAX_VERSION have not yet been tested so show a message to
+        # that effect.
+        if nuke_version[:2] > MAX_VERSION:
             # This is an untested version of Nuke.
             msg = (
                 "The Flow Production Tracking has not yet been fully tested "
@@ -194,22 +252,25 @@ class NukeEngine(sgtk.platform.Engine):
             # and the warning dialog isn't overridden by the config. Note that nuke.message isn't
             # available in Hiero, so we have to skip this there.
             if (
-                self.has_ui
+                self._ui_enabled
+                and not self._hiero_enabled
+                and not tk_nuke.g_compatibility_dialog_shown
                 and "TANK_NUKE_ENGINE_INIT_NAME" not in os.environ
                 and nuke_version[0]
-                >= self.get_setting("compatibility_dialog_min_version", 11)
-                and not self.hiero_enabled
+                >= self._get_cached_setting("compatibility_dialog_min_version", 11)
             ):
+                tk_nuke.g_compatibility_dialog_shown = True
                 nuke.message("Warning - Flow Production Tracking!\n\n%s" % msg)
 
             # Log the warning.
             self.logger.warning(msg)
 
         # Make sure we are not running Nuke PLE or Non-Commercial!
-        if nuke.env.get("ple"):
+        nuke_env = nuke.env
+        if nuke_env.get("ple"):
             self.logger.error("The Nuke Engine does not work with Nuke PLE!")
             return
-        elif nuke.env.get("nc"):
+        elif nuke_env.get("nc"):
             self.logger.error("The Nuke Engine does not work with Nuke Non-Commercial!")
             return
 
@@ -225,13 +286,13 @@ class NukeEngine(sgtk.platform.Engine):
 
         # Figure out what our menu will be named.
         self._menu_name = "Flow Production Tracking"
-        if self.get_setting("use_short_menu_name", False):
+        if self._get_cached_setting("use_short_menu_name", False):
             self._menu_name = "FPTR"
 
         # Do our mode-specific initializations.
-        if self.hiero_enabled:
+        if self._hiero_enabled:
             self.pre_app_init_hiero()
-        elif self.studio_enabled:
+        elif self._studio_enabled:
             self.pre_app_init_studio()
         else:
             self.pre_app_init_nuke()
@@ -246,8 +307,6 @@ class NukeEngine(sgtk.platform.Engine):
         """
         The Hiero-specific portion of engine initialization.
         """
-        self._last_clicked_selection = []
-        self._last_clicked_area = None
 
     def pre_app_init_nuke(self):
         """
@@ -258,7 +317,7 @@ class NukeEngine(sgtk.platform.Engine):
         # Store data needed for bootstrapping Sgtk in env vars.
         # Used in classic_startup/sgtk_startup.py, and plugins/basic/Python/tk_nuke_basic/plugin_bootstrap.py
         os.environ["TANK_ENGINE"] = self.instance_name
-        os.environ["TANK_CONTEXT"] = sgtk.context.serialize(self.context)
+        os.environ["TANK_CONTEXT"] = self._get_serialized_context()
 
         """
         https://jira.autodesk.com/browse/SG-25374
@@ -271,6 +330,20 @@ class NukeEngine(sgtk.platform.Engine):
             self._on_dialog_closed_monkeypatch
         )
 
+    def _get_serialized_context(self):
+        """
+        Returns the current context serialized so that it can be handed over
+        to new Nuke processes. The result is reused for as long as the engine
+        stays in the same context.
+
+        :returns: The serialized context string.
+        """
+        context, serialized_context = self._serialized_context
+        if context is not self.context:
+            serialized_context = sgtk.context.serialize(self.context)
+            self._serialized_context = (self.context, serialized_context)
+        return serialized_context
+
     @staticmethod
     def _on_dialog_closed_monkeypatch(self, result):
         """
@@ -301,9 +374,7 @@ class NukeEngine(sgtk.platform.Engine):
                 Weblogin does not show up in Nuke 11 and makes Nuke 12 and
                 13 to crash
                 """
-                base_dir = os.path.dirname(os.path.abspath(__file__))
-
-                msgbox_icon = os.path.join(base_dir, "resources", "alert_icon.png")
+                msgbox_icon = os.path.join(_RESOURCES_DIR, "alert_icon.png")
                 msgbox_parent = self._dialog
                 msgbox_title = "Nuke"
                 msgbox_text = [
@@ -344,9 +415,9 @@ class NukeEngine(sgtk.platform.Engine):
         """
 
         # We have some mode-specific initialization to do.
-        if self.hiero_enabled:
+        if self._hiero_enabled:
             self.post_app_init_hiero()
-        elif self.studio_enabled:
+        elif self._studio_enabled:
             self.post_app_init_studio()
 
             # We want to run the Nuke init, as well, to load up
@@ -362,12 +433,11 @@ class NukeEngine(sgtk.platform.Engine):
         """
         The Nuke Studio specific portion of the engine's post-init process.
         """
-        if self.has_ui:
+        if self._ui_enabled:
             # Note! not using the import as this confuses Nuke's callback system
             # (several of the key scene callbacks are in the main init file).
             import tk_nuke
             import hiero
-            from hiero.core import env as hiero_env
 
             # Create the menu!
             self._menu_generator = tk_nuke.NukeStudioMenuGenerator(
@@ -409,12 +479,11 @@ class NukeEngine(sgtk.platform.Engine):
         """
         The Hiero-specific portion of the engine's post-init process.
         """
-        if self.has_ui:
+        if self._ui_enabled:
             # Note! not using the import as this confuses Nuke's callback system
             # (several of the key scene callbacks are in the main init file).
             import tk_nuke
             import hiero
-            from hiero.core import env as hiero_env
 
             # Create the menu!
             self._menu_generator = tk_nuke.HieroMenuGenerator(self, self._menu_name)
@@ -435,19 +504,32 @@ class NukeEngine(sgtk.platform.Engine):
         The Nuke-specific portion of the engine's post-init process.
         """
 
-        if self.has_ui and not self.studio_enabled:
+        if self._ui_enabled and not self._studio_enabled:
             # Note! not using the import as this confuses Nuke's callback system
             # (several of the key scene callbacks are in the main init file).
             import tk_nuke
+            import nukescripts
 
             # Create the menu!
             #
             # We keep a reference to any previous menu generators that have
             # existed. This is to prevent a crash on close in Nuke 11 that occurs
             # after a context change is triggered.
-            self._previous_generators.append(self._menu_generator)
+            if self._menu_generator is not None:
+                self._previous_generators.append(self._menu_generator)
             self._menu_generator = tk_nuke.NukeMenuGenerator(self, self._menu_name)
-            self._menu_generator.create_menu()
+            if (
+                self._get_cached_setting("lazy_menu_build", False)
+                and not tk_nuke.g_lazy_menu_loaded
+            ):
+                # Only add a placeholder to the main menu for now, its full
+                # contents are built the first time the user clicks it. Once
+                # that has happened, the menu is always built right away.
+                self._menu_built = False
+                self._menu_generator.create_placeholder_menu(self._ensure_menu_built)
+            else:
+                self._menu_built = True
+                self._menu_generator.create_menu()
 
             # Initialize favourite dirs in the file open/file save dialogs
             self.__setup_favorite_dirs()
@@ -459,33 +541,66 @@ class NukeEngine(sgtk.platform.Engine):
             # part of saved layouts, nuke will look through
             # a global list of registered panels, try to locate
             # the one it needs and then run the callback.
+            register_panel = nukescripts.panels.registerPanel
             for panel_id, panel_dict in self.panels.items():
-                nukescripts.panels.registerPanel(
-                    panel_id,
-                    panel_dict["callback"],
-                )
+                register_panel(panel_id, panel_dict["callback"])
 
-        # Iterate over all apps, if there is a gizmo folder, add it to nuke path.
-        for app in self.apps.values():
-            # Add gizmos to nuke path.
-            app_gizmo_folder = os.path.join(app.disk_location, "gizmos")
-            if os.path.exists(app_gizmo_folder):
-                # Now translate the path so that nuke is happy on Windows.
-                app_gizmo_folder = app_gizmo_folder.replace(os.path.sep, "/")
-                self.logger.debug(
-                    "Gizmos found - Adding %s to nuke.pluginAddPath() and NUKE_PATH",
-                    app_gizmo_folder,
-                )
-                nuke.pluginAddPath(app_gizmo_folder)
-                # And also add it to the plugin path - this is so that any
-                # new processes spawned from this one will have access too.
-                # (for example if you do file->open or file->new)
-                sgtk.util.append_path_to_env_var("NUKE_PATH", app_gizmo_folder)
+        self._register_gizmos()
 
         # Nuke Studio 9 really doesn't like us running commands at startup, so don't.
-        if not (nuke.env.get("NukeVersionMajor") == 9 and nuke.env.get("studio")):
+        if not (self._nuke_version[0] == 9 and self._studio_enabled):
             self._run_commands_at_startup()
 
+    def _register_gizmos(self):
+        """
+        Adds the gizmo folder of each app to Nuke's plugin path and to NUKE_PATH.
+        """
+        import tk_nuke
+
+        # Iterate over all apps, if there is a gizmo folder, add it to nuke path.
+        gizmo_folder_cache = tk_nuke.g_gizmo_folder_cache
+        nuke_path = os.environ.get("NUKE_PATH", "")
+        nuke_paths = set(nuke_path.split(os.pathsep))
+        new_nuke_paths = []
+        for app in self.apps.values():
+            # Whether an app has a gizmo folder doesn't change during a session,
+            # so the lookup is only done the first time an app location is seen.
+            if app.disk_location in gizmo_folder_cache:
+                app_gizmo_folder = gizmo_folder_cache[app.disk_location]
+            else:
+                # Add gizmos to nuke path.
+                app_gizmo_folder = os.path.join(app.disk_location, "gizmos")
+                if not os.path.isdir(app_gizmo_folder):
+                    app_gizmo_folder = None
+                elif _NEEDS_SLASH_FIX:
+                    # Now translate the path so that nuke is happy on Windows.
+                    app_gizmo_folder = app_gizmo_folder.replace("\\", "/")
+                gizmo_folder_cache[app.disk_location] = app_gizmo_folder
+
+            # Gizmo folders added before a context change are already known
+            # to Nuke and don't need to be added again.
+            if app_gizmo_folder is None or app_gizmo_folder in self._gizmo_folders:
+                continue
+
+            self._gizmo_folders.add(app_gizmo_folder)
+            self.logger.debug(
+                "Gizmos found - Adding %s to nuke.pluginAddPath() and NUKE_PATH",
+                app_gizmo_folder,
+            )
+            nuke.pluginAddPath(app_gizmo_folder)
+            # And also add it to the plugin path - this is so that any
+            # new processes spawned from this one will have access too.
+            # (for example if you do file->open or file->new)
+            if app_gizmo_folder not in nuke_paths:
+                nuke_paths.add(app_gizmo_folder)
+                new_nuke_paths.append(app_gizmo_folder)
+
+        # Update NUKE_PATH once with all the new gizmo folders.
+        if new_nuke_paths:
+            if nuke_path:
+                new_nuke_paths.insert(0, nuke_path)
+            os.environ["NUKE_PATH"] = os.pathsep.join(new_nuke_paths)
+
     @property
     def host_info(self):
         """
@@ -493,10 +608,15 @@ class NukeEngine(sgtk.platform.Engine):
                   dictionary with informations about the application hosting this
                   engine.
         """
+        # The host application doesn't change during the session, so it is only
+        # looked up once. A copy is returned so callers can't alter the cache.
+        if self._host_info is not None:
+            return dict(self._host_info)
+
         app_name = "Nuke"
         version = ""
         try:
-            if self.studio_enabled:
+            if self._studio_enabled:
                 app_name = "Nuke Studio"
                 from hiero.core import env as hiero_env
 
@@ -507,7 +627,7 @@ class NukeEngine(sgtk.platform.Engine):
                     hiero_env["VersionMinor"],
                     hiero_env["VersionRelease"],
                 )
-            elif self.hiero_enabled:
+            elif self._hiero_enabled:
                 from hiero.core import env as hiero_env
 
                 # VersionString is something like 'Hiero 10.5v1', it seems safer to
@@ -535,23 +655,30 @@ class NukeEngine(sgtk.platform.Engine):
             # string for the version in this situation.
             pass
 
-        return {"name": app_name, "version": version}
+        self._host_info = {"name": app_name, "version": version}
+        return dict(self._host_info)
 
     def _run_commands_at_startup(self):
+        run_at_startup = self._get_cached_setting("run_at_startup", [])
+        if not run_at_startup:
+            return
+
         # Build a dictionary mapping app instance names to dictionaries of commands they registered with the engine.
-        app_instance_commands = {}
+        # Only the app instances listed in the 'run_at_startup' setting are needed.
+        startup_app_names = set(
+            app_setting_dict["app_instance"] for app_setting_dict in run_at_startup
+        )
+        app_instance_commands = collections.defaultdict(dict)
         for command_name, value in self.commands.items():
             app_instance = value["properties"].get("app")
-            if app_instance:
+            if app_instance and app_instance.instance_name in startup_app_names:
                 # Add entry 'command name: command function' to the command dictionary of this app instance.
-                command_dict = app_instance_commands.setdefault(
-                    app_instance.instance_name, {}
-                )
+                command_dict = app_instance_commands[app_instance.instance_name]
                 command_dict[command_name] = value["callback"]
 
         commands_to_run = []
         # Run the series of app instance commands listed in the 'run_at_startup' setting.
-        for app_setting_dict in self.get_setting("run_at_startup", []):
+        for app_setting_dict in run_at_startup:
             app_instance_name = app_setting_dict["app_instance"]
             # Menu name of the command to run or '' to run all commands of the given app instance.
             setting_command_name = app_setting_dict["name"]
@@ -568,14 +695,14 @@ class NukeEngine(sgtk.platform.Engine):
             else:
                 if not setting_command_name:
                     # Run all commands of the given app instance.
-                    for command_name, command_function in command_dict.items():
+                    for command_name in command_dict:
                         self.logger.debug(
                             "%s startup running app '%s' command '%s'.",
                             self.name,
                             app_instance_name,
                             command_name,
                         )
-                        commands_to_run.append(command_function)
+                    commands_to_run.extend(command_dict.values())
                 else:
                     # Run the command whose name is listed in the 'run_at_startup' setting.
                     command_function = command_dict.get(setting_command_name)
@@ -632,10 +759,12 @@ class NukeEngine(sgtk.platform.Engine):
         if self._context_switcher:
             self._context_switcher.destroy()
 
-        if self.has_ui:
+        # The menu generator may never have been created, for example when
+        # the engine bailed out early during initialization.
+        if self._ui_enabled and self._menu_generator is not None:
             self._menu_generator.destroy_menu()
 
-        if self.hiero_enabled or self.studio_enabled:
+        if self._hiero_enabled or self._studio_enabled:
             import hiero.core
 
             hiero.core.events.unregisterInterest(
@@ -647,7 +776,7 @@ class NukeEngine(sgtk.platform.Engine):
                 self._on_project_load_callback,
             )
 
-            if self.studio_enabled:
+            if self._studio_enabled:
                 hiero.core.events.unregisterInterest(
                     "kSelectionChanged",
                     self._handle_studio_selection_change,
@@ -660,6 +789,10 @@ class NukeEngine(sgtk.platform.Engine):
         :param old_context: The sgtk.context.Context being switched away from.
         :param new_context: The sgtk.context.Context being switched to.
         """
+        # The new context may come with a different environment, so settings
+        # have to be resolved again.
+        self._setting_cache.clear()
+
         # As we've changed contexts, we should update our environment variables so that if we spawn a new nuke instance
         # it will start up in the same environment.
         self.pre_app_init_nuke()
@@ -670,16 +803,27 @@ class NukeEngine(sgtk.platform.Engine):
 
         tk_nuke.tank_ensure_callbacks_registered(engine=self)
 
-        self.logger.debug("tk-nuke context changed to %s", str(new_context))
+        self.logger.debug("tk-nuke context changed to %s", new_context)
 
         # We also need to run the post init for Nuke, which will handle
         # getting any gizmos setup.
-        if not self.hiero_enabled:
+        if not self._hiero_enabled:
             self.post_app_init_nuke()
 
-        if self.has_ui and self._context_change_menu_rebuild:
+        if self._ui_enabled and self._context_change_menu_rebuild and self._menu_built:
             self.menu_generator.create_menu()
 
+    def _ensure_menu_built(self):
+        """
+        Builds the full menu if it was deferred by the lazy_menu_build setting.
+        """
+        import tk_nuke
+
+        if not self._menu_built:
+            self._menu_built = True
+            tk_nuke.g_lazy_menu_loaded = True
+            self._menu_generator.create_menu()
+
     #####################################################################################
     # Logging
 
@@ -695,28 +839,33 @@ class NukeEngine(sgtk.platform.Engine):
         msg = handler.format(record)
 
         # Sends the message to error console of the DCC
-        if self.hiero_enabled:
-            import hiero
+        if self._hiero_enabled:
+            hiero_log = self._hiero_log
+            if hiero_log is None:
+                import hiero
 
-            existing_log_level = hiero.core.log.logLevel()
+                hiero_log = self._hiero_log = hiero.core.log
 
             if record.levelno >= logging.ERROR:
-                hiero.core.log.error(msg)
-            elif record.levelno >= logging.WARNING:
-                hiero.core.log.info(msg)
+                hiero_log.error(msg)
             elif record.levelno >= logging.INFO:
-                hiero.core.log.info(msg)
+                # Hiero has no warning level, warnings are logged as info.
+                hiero_log.info(msg)
             else:
-                hiero.core.log.setLogLevel(hiero.core.log.kDebug)
-                hiero.core.log.debug(msg)
-                hiero.core.log.setLogLevel(existing_log_level)
+                existing_log_level = hiero_log.logLevel()
+                if existing_log_level == hiero_log.kDebug:
+                    hiero_log.debug(msg)
+                else:
+                    hiero_log.setLogLevel(hiero_log.kDebug)
+                    hiero_log.debug(msg)
+                    hiero_log.setLogLevel(existing_log_level)
         else:
             if record.levelno >= logging.CRITICAL:
-                nuke.critical("PTR Critical: %s" % msg)
+                nuke.critical("PTR Critical: " + msg)
             elif record.levelno >= logging.ERROR:
-                nuke.error("PTR Error: %s" % msg)
+                nuke.error("PTR Error: " + msg)
             elif record.levelno >= logging.WARNING:
-                nuke.warning("PTR Warning: %s" % msg)
+                nuke.warning("PTR Warning: " + msg)
 
         # Sends the message to the script editor.
         self.async_execute_in_main_thread(print, msg)
@@ -743,7 +892,7 @@ class NukeEngine(sgtk.platform.Engine):
 
         Additional parameters specified will be passed through to the widget_class constructor.
         """
-        if self.hiero_enabled:
+        if self._hiero_enabled:
             self.logger.info(
                 "Panels are not supported in Hiero. Launching as a dialog..."
             )
@@ -770,24 +919,14 @@ class NukeEngine(sgtk.platform.Engine):
             # if possible, because this is typically laid out like a classic
             # panel UI - narrow and tall. If not possible, then fall back on other
             # built-in objects and use these to find a location.
-            #
-            # Note: on Nuke versions prior to 9, a pane is required for the UI to appear.
-            built_in_tabs = [
-                "Properties.1",  # properties dialog - best choice to parent next to
-                "DAG.1",  # node graph, so usually wide not tall
-                "DopeSheet.1",  # dope sheet, usually wide, not tall
-                "Viewer.1",  # viewer
-                "Toolbar.1",  # nodes toolbar
-            ]
-
             existing_pane = None
-            for tab_name in built_in_tabs:
-                self.logger.debug("Parenting panel - looking for %s tab...", tab_name)
+            for tab_name in _BUILT_IN_TABS:
                 existing_pane = nuke.getPaneFor(tab_name)
                 if existing_pane:
+                    self.logger.debug("Parenting panel - found %s tab.", tab_name)
                     break
 
-            if existing_pane is None and nuke.env.get("NukeVersionMajor") < 9:
+            if existing_pane is None and self._nuke_version[0] < 9:
                 # Couldn't find anything to parent next to!
                 # Nuke 9 will automatically handle this situation
                 # but older versions will not show the UI!
@@ -864,22 +1003,27 @@ class NukeEngine(sgtk.platform.Engine):
         """
         import hiero
 
+        project_path = self.sgtk.project_path
+        # In Nuke 11 and greater the Project.projectRoot and Project.setProjectRoot methods
+        # have been deprecated in favour of Project.exportRootDirectory and
+        # Project.setProjectDirectory.
+        use_export_root = self._nuke_version[0] >= 11
+
         for p in hiero.core.projects():
-            # In Nuke 11 and greater the Project.projectRoot and Project.setProjectRoot methods
-            # have been deprecated in favour of Project.exportRootDirectory and
-            # Project.setProjectDirectory.
-            if nuke.env.get("NukeVersionMajor") >= 11 and not p.exportRootDirectory():
+            if use_export_root:
+                if p.exportRootDirectory():
+                    continue
                 self.logger.debug(
-                    "Setting exportRootDirectory on %s to: %s",
-                    p.name(),
-                    self.sgtk.project_path,
+                    "Setting exportRootDirectory on %s to: %s", p.name(), project_path
                 )
-                p.setProjectDirectory(self.sgtk.project_path)
-            elif nuke.env.get("NukeVersionMajor") <= 10 and not p.projectRoot():
+                p.setProjectDirectory(project_path)
+            else:
+                if p.projectRoot():
+                    continue
                 self.logger.debug(
-                    "Setting projectRoot on %s to: %s", p.name(), self.sgtk.project_path
+                    "Setting projectRoot on %s to: %s", p.name(), project_path
                 )
-                p.setProjectRoot(self.sgtk.project_path)
+                p.setProjectRoot(project_path)
 
     def _get_dialog_parent(self):
         """
@@ -890,7 +1034,7 @@ class NukeEngine(sgtk.platform.Engine):
         # for more info. There have been instability issues with nuke 7 causing
         # various crashes, so window parenting on Nuke versions above 6 is
         # currently disabled.
-        if nuke.env.get("NukeVersionMajor") == 7:
+        if self._nuke_version[0] == 7:
             return None
         return super(NukeEngine, self)._get_dialog_parent()
 
@@ -907,7 +1051,12 @@ class NukeEngine(sgtk.platform.Engine):
         import hiero
 
         try:
-            for item in sender.selection():
+            selection = sender.selection()
+            if not selection:
+                return
+
+            clip_type = hiero.core.Clip
+            for item in selection:
                 # Depending on whether this is a BinItem or something
                 # else, we have different ways of getting to the Clip
                 # object for the item.
@@ -916,19 +1065,19 @@ class NukeEngine(sgtk.platform.Engine):
                 except AttributeError:
                     clip = item.activeItem()
 
-                if isinstance(clip, hiero.core.Clip):
+                if isinstance(clip, clip_type):
                     media = clip.mediaSource()
                     infos = media.fileinfos()
                     file_path = str(infos[0].filename())
 
-                    # If we've already seen this file selected before, or if it's
-                    # not a .nk file, then we don't need to do anything.
-                    if file_path not in self._processed_paths and file_path.endswith(
-                        ".nk"
+                    # If it's not a .nk file, or if we've already seen this file
+                    # selected before, then we don't need to do anything.
+                    if (
+                        file_path.endswith(".nk")
+                        and file_path not in self._processed_paths
                     ):
-                        self._processed_paths.append(file_path)
+                        self._processed_paths.add(file_path)
                         self._context_change_menu_rebuild = False
-                        current_context = self.context
                         target_context = self._context_switcher.get_new_context(
                             file_path
                         )
@@ -944,12 +1093,12 @@ class NukeEngine(sgtk.platform.Engine):
                             )
 
                             if env_name not in self._processed_environments:
-                                self._processed_environments.append(env_name)
+                                self._processed_environments.add(env_name)
                                 self._context_switcher.change_context(target_context)
         except Exception as e:
             # If anything went wrong, we can just let the finally block
             # run, which will put things back to the way they were.
-            self.logger.debug("Unable to pre-load environment: %s", str(e))
+            self.logger.debug("Unable to pre-load environment: %s", e)
         finally:
             # If the context was changed during the course of the handling
             # of the selection event, we need to go back to what we had.
@@ -969,7 +1118,11 @@ class NukeEngine(sgtk.platform.Engine):
         """
         import hiero.core
 
-        project = hiero.core.projects()[-1]
+        # The loaded project is the sender of the event. Fall back to the most
+        # recently opened project if it isn't there.
+        project = getattr(event, "sender", None)
+        if not isinstance(project, hiero.core.Project):
+            project = hiero.core.projects()[-1]
         script_path = project.path()
 
         # We're going to just skip doing anything if this fails
@@ -1014,11 +1167,7 @@ class NukeEngine(sgtk.platform.Engine):
         :return: dict
         """
 
-        nuke_version = (
-            nuke.env.get("NukeVersionMajor"),
-            nuke.env.get("NukeVersionMinor"),
-            nuke.env.get("NukeVersionRelease"),
-        )
+        nuke_version = self._nuke_version
 
         # Disable the importing of the web engine widgets submodule from PySide2
         # if this is a Windows environment. Failing to do so will cause Nuke to freeze on startup.
@@ -1040,68 +1189,102 @@ class NukeEngine(sgtk.platform.Engine):
         one in the UI. Doing them via the api only updates them for the session (Nuke bug #3740).
         See http://forums.thefoundry.co.uk/phpBB2/viewtopic.php?t=3481&start=15
         """
-        engine_root_dir = self.disk_location
-        sg_logo = os.path.abspath(
-            os.path.join(engine_root_dir, "resources", "sg_logo_80px.png")
-        )
+        import tk_nuke
 
-        # Ensure old favorites we used to use are removed.
-        supported_entity_types = ["Shot", "Sequence", "Scene", "Asset", "Project"]
-        for x in supported_entity_types:
-            nuke.removeFavoriteDir("Tank Current %s" % x)
-        nuke.removeFavoriteDir("Tank Current Work")
-        nuke.removeFavoriteDir("PTR Current Project")
-        nuke.removeFavoriteDir("PTR Current Work")
+        # Ensure old favorites we used to use are removed. They are never added
+        # back, so this only needs to happen once per Nuke session.
+        if not tk_nuke.g_legacy_favorites_removed:
+            for name in _LEGACY_FAVORITE_NAMES:
+                nuke.removeFavoriteDir(name)
+            tk_nuke.g_legacy_favorites_removed = True
+
+        # Collect the favorites for the current context as
+        # {display name: (directory, icon)}, so they can be compared with
+        # the ones added on the previous call.
+        favorite_dirs = {}
+        # Every display name the config uses, including favorites that can't
+        # be resolved in the current context.
+        configured_names = set()
 
         # Add favorties for current project root(s).
         proj = self.context.project
-        current_proj_fav = self.get_setting("project_favourite_name")
+        current_proj_fav = self._get_cached_setting("project_favourite_name")
         # Only add these current project entries if we have a value from settings.
         # Otherwise, they have opted to not show them.
         if proj and current_proj_fav:
             proj_roots = self.sgtk.roots
+            multiple_roots = len(proj_roots) > 1
             for root_name, root_path in proj_roots.items():
                 dir_name = current_proj_fav
-                if len(proj_roots) > 1:
+                if multiple_roots:
                     dir_name += " (%s)" % root_name
-
-                # Remove old directory
-                nuke.removeFavoriteDir(dir_name)
-
-                # Add new path
-                nuke.addFavoriteDir(
-                    dir_name,
-                    directory=root_path,
-                    type=(nuke.IMAGE | nuke.SCRIPT | nuke.GEO),
-                    icon=sg_logo,
-                    tooltip=root_path,
-                )
+                configured_names.add(dir_name)
+                favorite_dirs[dir_name] = (root_path, _SG_LOGO_PATH)
 
         # Add favorites directories from the config
-        for favorite in self.get_setting("favourite_directories"):
-            # Remove old directory
-            nuke.removeFavoriteDir(favorite["display_name"])
-            try:
-                template = self.get_template_by_name(favorite["template_directory"])
-                fields = self.context.as_template_fields(template)
-                path = template.apply_fields(fields)
-            except Exception as e:
-                msg = (
+        # Several favorites can use the same template, which only needs to be
+        # resolved once.
+        template_paths = {}
+        for favorite in self._get_cached_setting("favourite_directories") or []:
+            configured_names.add(favorite["display_name"])
+            template_name = favorite["template_directory"]
+            path = template_paths.get(template_name)
+            if path is None:
+                template = self.get_template_by_name(template_name)
+                if template is None:
+                    self.logger.warning(
+                        "Unknown template '%s' for favorite directory '%s'.",
+                        template_name,
+                        favorite["display_name"],
+                    )
+                    continue
+
+                error_msg = (
                     "Error processing template '%s' to add to favorite "
-                    "directories: %s" % (favorite["template_directory"], e)
+                    "directories: %s"
                 )
-                self.logger.exception(msg)
-                continue
+                try:
+                    fields = self.context.as_template_fields(template)
+                    path = template.apply_fields(fields)
+                except sgtk.TankError as e:
+                    # The context doesn't have all the fields the template needs.
+                    self.logger.warning(error_msg, template_name, e)
+                    continue
+                except Exception as e:
+                    self.logger.exception(error_msg, template_name, e)
+                    continue
+                template_paths[template_name] = path
 
-            # Add new directory
             icon_path = favorite.get("icon")
-            if not os.path.isfile(icon_path) or not os.path.exists(icon_path):
-                icon_path = sg_logo
+            if not icon_path or not os.path.isfile(icon_path):
+                icon_path = _SG_LOGO_PATH
+            favorite_dirs[favorite["display_name"]] = (path, icon_path)
+
+        # Remove favorites added for a previous context that are not
+        # relevant anymore. On the first setup for this engine, favorites
+        # left over by a previous engine are unknown, so remove every
+        # configured name.
+        stale_names = set(self._favorite_dirs)
+        if not self._favorite_dirs:
+            stale_names.update(configured_names)
+        for name in stale_names - set(favorite_dirs):
+            nuke.removeFavoriteDir(name)
+
+        # Only update the favorites that are new or changed since the
+        # previous call, since each update refreshes Nuke's UI.
+        for name, (directory, icon_path) in favorite_dirs.items():
+            if self._favorite_dirs.get(name) == (directory, icon_path):
+                continue
+
+            # Remove old directory
+            nuke.removeFavoriteDir(name)
 
+            # Add new directory
             nuke.addFavoriteDir(
-                favorite["display_name"],
-                directory=path,
-                type=(nuke.IMAGE | nuke.SCRIPT | nuke.GEO),
+                name,
+                directory=directory,
+                type=_FAVORITE_DIR_TYPES,
                 icon=icon_path,
-                tooltip=path,
+                tooltip=directory,
             )
+        self._favorite_dirs = favorite_dirs
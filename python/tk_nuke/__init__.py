@@ -17,8 +17,8 @@ not necessarily fully initialized. Therefore, any modules that require
 QT to be imported should be placed in the tk_nuke_qt module instead
 in order to avoid import errors at startup and context switch.
 """
+import functools
 import os
-import textwrap
 import nuke
 import sgtk
 import sys
@@ -57,7 +57,7 @@ def __create_tank_disabled_menu(details):
         nuke_menu = nuke.menu("Nuke")
         sg_menu = nuke_menu.addMenu("Flow Production Tracking")
         sg_menu.clearMenu()
-        cmd = lambda d=details: __show_tank_disabled_message(d)
+        cmd = functools.partial(__show_tank_disabled_message, details)
         sg_menu.addCommand("Toolkit is disabled.", cmd)
     else:
         msg = "The Flow Production Tracking is disabled: %s" % details
@@ -110,8 +110,10 @@ def __engine_refresh(new_context):
         # try to create new engine
         try:
             logger.debug(
-                "Starting new engine: %s, %s, %s"
-                % (engine_name, new_context.sgtk, new_context)
+                "Starting new engine: %s, %s, %s",
+                engine_name,
+                new_context.sgtk,
+                new_context,
             )
             sgtk.platform.start_engine(engine_name, new_context.sgtk, new_context)
         except sgtk.TankEngineInitError as e:
@@ -131,14 +133,14 @@ def __sgtk_on_save_callback():
     file_name = nuke.root().name()
 
     try:
-        logger.debug("PTR Callback: addOnScriptSave('%s')" % file_name)
+        logger.debug("PTR Callback: addOnScriptSave('%s')", file_name)
         # this file could be in another project altogether, so create a new Tank
         # API instance.
         try:
             tk = sgtk.sgtk_from_path(file_name)
-            logger.debug("Tk instance '%r' associated with path '%s'" % (tk, file_name))
+            logger.debug("Tk instance '%r' associated with path '%s'", tk, file_name)
         except sgtk.TankError as e:
-            logger.exception("Could not execute tank_from_path('%s')" % file_name)
+            logger.exception("Could not execute tank_from_path('%s')", file_name)
             __create_tank_disabled_menu(e)
             return
 
@@ -150,7 +152,7 @@ def __sgtk_on_save_callback():
 
         # and now extract a new context based on the file
         new_ctx = tk.context_from_path(file_name, curr_ctx)
-        logger.debug("New context computed to be: %r" % new_ctx)
+        logger.debug("New context computed to be: %r", new_ctx)
 
         # now restart the engine with the new context
         __engine_refresh(new_ctx)
@@ -173,8 +175,8 @@ def sgtk_on_load_callback():
         # context switching is enabled and change if possible
         engine = sgtk.platform.current_engine()
         file_name = nuke.root().name()
-        logger.debug("Currently running engine: %s" % (engine,))
-        logger.debug("File name to load: '%s'" % (file_name,))
+        logger.debug("Currently running engine: %s", engine)
+        logger.debug("File name to load: '%s'", file_name)
 
         if (
             file_name != "Root"
@@ -187,14 +189,14 @@ def sgtk_on_load_callback():
             logger.debug(
                 "Engine running, a script is loaded into nuke and auto-context switch is on."
             )
-            logger.debug("Will attempt to execute tank_from_path('%s')" % (file_name,))
+            logger.debug("Will attempt to execute tank_from_path('%s')", file_name)
             try:
                 # todo: do we need to create a new tk object, instead should we just
                 # check that the context gets created correctly?
                 tk = sgtk.sgtk_from_path(file_name)
-                logger.debug("Instance '%s'is associated with '%s'" % (tk, file_name))
+                logger.debug("Instance '%s'is associated with '%s'", tk, file_name)
             except sgtk.TankError as e:
-                logger.debug("No tk instance associated with '%s': %s" % (file_name, e))
+                logger.debug("No tk instance associated with '%s': %s", file_name, e)
                 # The current file does not belong to any known Toolkit project,
                 # check if the 'allow_keep_context_from_project' engine setting is
                 # enabled to see if we should keep the Project context
@@ -202,8 +204,8 @@ def sgtk_on_load_callback():
                     cur_project = engine.context.project
                     if cur_project:
                         logger.debug(
-                            "Trying to create context from Project '%s'"
-                            % (cur_project["name"])
+                            "Trying to create context from Project '%s'",
+                            cur_project["name"],
                         )
                         tk = sgtk.sgtk_from_entity("Project", cur_project["id"])
                         proj_ctx = tk.context_from_entity("Project", cur_project["id"])
@@ -219,8 +221,8 @@ def sgtk_on_load_callback():
 
             logger.debug("")
             new_ctx = tk.context_from_path(file_name, curr_ctx)
-            logger.debug("Current context: %r" % (curr_ctx,))
-            logger.debug("New context: %r" % (new_ctx,))
+            logger.debug("Current context: %r", curr_ctx)
+            logger.debug("New context: %r", new_ctx)
             # Now switch to the context appropriate for the file
             __engine_refresh(new_ctx)
 
@@ -229,17 +231,17 @@ def sgtk_on_load_callback():
             # due to a non Toolkit file being opened, prior to this new file. We must
             # create a sgtk instance from the script path.
             logger.debug("Nuke file is already loaded but no tk engine running.")
-            logger.debug("Will attempt to execute tank_from_path('%s')" % (file_name,))
+            logger.debug("Will attempt to execute tank_from_path('%s')", file_name)
             try:
                 tk = sgtk.sgtk_from_path(file_name)
-                logger.debug("Instance '%s'is associated with '%s'" % (tk, file_name))
+                logger.debug("Instance '%s'is associated with '%s'", tk, file_name)
             except sgtk.TankError as e:
-                logger.debug("No tk instance associated with '%s': %s" % (file_name, e))
+                logger.debug("No tk instance associated with '%s': %s", file_name, e)
                 __create_tank_disabled_menu(e)
                 return
 
             new_ctx = tk.context_from_path(file_name)
-            logger.debug("New context: %r" % (new_ctx,))
+            logger.debug("New context: %r", new_ctx)
             # Now switch to the context appropriate for the file
             __engine_refresh(new_ctx)
 
@@ -248,6 +250,23 @@ def sgtk_on_load_callback():
         __create_tank_error_menu()
 
 
+# Whether the engine has shown the untested Nuke version dialog. The engine
+# module is reloaded each time an engine starts, so this has to live here to be
+# remembered for the whole Nuke session.
+g_compatibility_dialog_shown = False
+
+# Gizmo folder of each app location, or None if the app has none. Kept here
+# for the same reason, so engine restarts don't probe the disk again.
+g_gizmo_folder_cache = {}
+
+# Whether the favorite directories added by older versions of the engine have
+# been removed.
+g_legacy_favorites_removed = False
+
+# Whether the user has loaded the full menu deferred by the lazy_menu_build
+# setting, after which the menu is no longer deferred.
+g_lazy_menu_loaded = False
+
 g_tank_callbacks_registered = False
 
 
@@ -267,7 +286,7 @@ def tank_ensure_callbacks_registered(engine=None):
             nuke.addOnScriptLoad(sgtk_on_load_callback)
             nuke.addOnScriptSave(__sgtk_on_save_callback)
             g_tank_callbacks_registered = True
-    elif engine and not engine.get_setting("automatic_context_switch"):
+    else:
         # we have an engine but the automatic context switching has been disabled, we should ensure the callbacks
         # are removed.
         if g_tank_callbacks_registered:
@@ -10,14 +10,13 @@
 
 """Menu handling for Nuke and Hiero."""
 
+import functools
 import sgtk
 import sys
 import nuke
 import os
 import unicodedata
 import traceback
-import nukescripts.openurl
-import nukescripts
 
 try:
     from tank_vendor import sgutils
@@ -508,7 +507,7 @@ class NukeStudioMenuGenerator(HieroMenuGenerator):
 
         import nuke
 
-        callback = lambda m=msg: nuke.message(m)
+        callback = functools.partial(nuke.message, msg)
         cmd = HieroAppCommand(
             self.engine,
             cmd_name,
@@ -536,7 +535,7 @@ class NukeMenuGenerator(BaseMenuGenerator):
         super(NukeMenuGenerator, self).__init__(engine, menu_name)
         self._dialogs = []
 
-    def create_menu(self, add_commands=True):
+    def create_menu(self, add_commands=True, load_callback=None):
         """
         Creates the "Flow Production Tracking" menu in Nuke.
 
@@ -544,7 +543,14 @@ class NukeMenuGenerator(BaseMenuGenerator):
                                 the newly-created menu. If False, the menu
                                 will be created, but no contents will be
                                 added. Defaults to True.
+        :param load_callback:   If set, the main menu only gets a single
+                                command calling it, which is used to build
+                                the main menu contents later on. Node and
+                                pane commands are still added. Defaults to
+                                None.
         """
+        build_main_menu = load_callback is None
+
         # Create main Shotgun menu.
         menu_handle = nuke.menu("Nuke").addMenu(self._menu_name)
         node_menu_handle = nuke.menu("Nodes").addMenu(
@@ -562,9 +568,14 @@ class NukeMenuGenerator(BaseMenuGenerator):
         if not add_commands:
             return
 
-        # Now add the context item on top of the main menu.
-        self._context_menu = self._add_context_menu(menu_handle)
-        menu_handle.addSeparator()
+        if build_main_menu:
+            # Now add the context item on top of the main menu.
+            self._context_menu = self._add_context_menu(menu_handle)
+            menu_handle.addSeparator()
+        else:
+            menu_handle.addCommand(
+                "Load Menu...", load_callback, icon=self._shotgun_logo_blue
+            )
 
         # Now enumerate all items and create menu objects for them.
         menu_items = []
@@ -575,19 +586,23 @@ class NukeMenuGenerator(BaseMenuGenerator):
         menu_items.sort(key=lambda x: x.name)
 
         # Now add favourites.
-        for fav in self.engine.get_setting("menu_favourites"):
-            app_instance_name = fav["app_instance"]
-            menu_name = fav["name"]
-            hotkey = fav.get("hotkey")
+        if build_main_menu:
+            for fav in self.engine.get_setting("menu_favourites"):
+                app_instance_name = fav["app_instance"]
+                menu_name = fav["name"]
+                hotkey = fav.get("hotkey")
 
-            # Scan through all menu items.
-            for cmd in menu_items:
-                if cmd.app_instance_name == app_instance_name and cmd.name == menu_name:
-                    # Found our match!
-                    cmd.add_command_to_menu(menu_handle, hotkey=hotkey)
-                    # Mark as a favourite item.
-                    cmd.favourite = True
-        menu_handle.addSeparator()
+                # Scan through all menu items.
+                for cmd in menu_items:
+                    if (
+                        cmd.app_instance_name == app_instance_name
+                        and cmd.name == menu_name
+                    ):
+                        # Found our match!
+                        cmd.add_command_to_menu(menu_handle, hotkey=hotkey)
+                        # Mark as a favourite item.
+                        cmd.favourite = True
+            menu_handle.addSeparator()
 
         # Now go through all of the menu items.
         # Separate them out into various sections.
@@ -605,8 +620,9 @@ class NukeMenuGenerator(BaseMenuGenerator):
                 if command_context is None or command_context is self.engine.context:
                     node_menu_handle.addCommand(cmd.name, cmd.callback, icon=icon)
             elif cmd.type == "context_menu":
-                cmd.add_command_to_menu(self._context_menu)
-            else:
+                if build_main_menu:
+                    cmd.add_command_to_menu(self._context_menu)
+            elif build_main_menu:
                 # Normal menu.
                 app_name = cmd.app_name
                 if app_name is None:
@@ -628,7 +644,19 @@ class NukeMenuGenerator(BaseMenuGenerator):
                 cmd.add_command_to_pane_menu(pane_menu)
 
         # Now add all apps to main menu.
-        self._add_app_menu(commands_by_app, menu_handle)
+        if build_main_menu:
+            self._add_app_menu(commands_by_app, menu_handle)
+
+    def create_placeholder_menu(self, callback):
+        """
+        Creates the "Flow Production Tracking" menus in Nuke, with a single
+        command in the main menu that is used to build its contents on demand.
+        The node and pane menus are built right away.
+
+        :param callback: Callable that builds the full menu when the
+                         placeholder command is clicked.
+        """
+        self.create_menu(load_callback=callback)
 
     def create_disabled_menu(self, cmd_name, msg):
         """
@@ -642,7 +670,7 @@ class NukeMenuGenerator(BaseMenuGenerator):
 
         import nuke
 
-        callback = lambda m=msg: nuke.message(m)
+        callback = functools.partial(nuke.message, msg)
         cmd = NukeAppCommand(
             self.engine,
             cmd_name,